@@ -19,8 +19,126 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import functools
+import io
+
+import yaml
+
+try:
+    # libyaml's C emitter, when available, is much faster than the
+    # pure-Python one.
+    from yaml import CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+
 __all__ = ['add_property', 'build_configuration_schema']
 
+@functools.lru_cache(maxsize=1024)
+def _format_leaf(
+    prop_name: str,
+    ptype: str,
+    desc: str,
+    default_repr: str | None,
+    item_key: tuple | None,
+    indent_level: int,
+) -> str:
+    """Format a non-object property, caching the result.
+
+    BLOCK schemas tend to repeat a small set of leaf property shapes,
+    so identical (name, type, description, default) combinations are
+    formatted once and served from the cache afterwards.
+    """
+    indent = '  ' * indent_level
+    inner = indent + '  '
+    parts = [
+        f'{indent}{prop_name}:\n'
+        f'{inner}description: {desc}\n'
+        f'{inner}type: {ptype}\n'
+    ]
+
+    if default_repr is not None:
+        parts.append(f'{inner}default: {default_repr}\n')
+
+    if item_key is not None:
+        item_type, minimum, maximum = item_key
+        parts.append(f'{inner}items:\n{inner}  type: {item_type}\n')
+        if minimum is not None:
+            parts.append(f'{inner}  minimum: {minimum}\n')
+        if maximum is not None:
+            parts.append(f'{inner}  maximum: {maximum}\n')
+
+    return ''.join(parts)
+
+
+def _write_property(buf: io.StringIO, prop_name: str, prop_details: dict, indent_level: int) -> None:
+    """Write the formatted lines for a property to a shared output buffer.
+
+    Writing into a single buffer shared across the recursion keeps schema
+    building linear in the output size; no intermediate string is
+    materialized at any recursion level.
+
+    Parameters
+    ----------
+    buf : io.StringIO
+        Output buffer shared across recursive calls.
+    prop_name : str
+        The name of the property.
+    prop_details : dict
+        A dictionary with keys 'description', 'type', and optionally 'default'.
+    indent_level : int
+        The number of indentation levels to add to the property.
+    """
+    ptype = prop_details["type"]
+
+    if ptype != "object":
+        # Leaf properties are served from the memoized formatter.
+        default_repr = None
+        if "default" in prop_details:
+            default_value = prop_details["default"]
+            if ptype == "string":
+                default_value = f'"{default_value}"'
+            default_repr = f'{default_value}'
+
+        item_key = None
+        if ptype == "array" and "items" in prop_details:
+            # Keep the array item type without the description
+            item_details = prop_details["items"]
+            item_key = (
+                item_details["type"],
+                item_details.get("minimum"),
+                item_details.get("maximum"),
+            )
+
+        buf.write(
+            _format_leaf(
+                prop_name,
+                ptype,
+                prop_details["description"],
+                default_repr,
+                item_key,
+                indent_level,
+            )
+        )
+        return
+
+    indent = '  ' * indent_level
+    inner = indent + '  '
+    buf.write(
+        f'{indent}{prop_name}:\n'
+        f'{inner}description: {prop_details["description"]}\n'
+        f'{inner}type: {ptype}\n'
+    )
+
+    # Handle default values
+    if "default" in prop_details:
+        buf.write(f'{inner}default: {prop_details["default"]}\n')
+
+    if "properties" in prop_details:
+        buf.write(f'{inner}properties:\n')
+        for nested_name, nested_details in prop_details["properties"].items():
+            _write_property(buf, nested_name, nested_details, indent_level + 2)
+
+
 def add_property(prop_name: str, prop_details: dict, indent_level: int = 1) -> str:
     """Add a property to a configuration json-formatted schema string.
 
@@ -38,35 +156,62 @@ def add_property(prop_name: str, prop_details: dict, indent_level: int = 1) -> s
     str
         The formatted property string.
     """
-    indent = '  ' * indent_level
-    schema_str = f'{indent}{prop_name}:\n'
-    schema_str += f'{indent}  description: {prop_details["description"]}\n'
-    schema_str += f'{indent}  type: {prop_details["type"]}\n'
+    buf = io.StringIO()
+    _write_property(buf, prop_name, prop_details, indent_level)
+    return buf.getvalue()
+
+
+def _freeze(value):
+    """Return a hashable form of a nested properties structure, suitable
+    as a cache key. Dicts and lists become tuples; insertion order is
+    preserved since it determines the emitted schema."""
+    if isinstance(value, dict):
+        return tuple((key, _freeze(val)) for key, val in value.items())
+    if isinstance(value, list):
+        return tuple(_freeze(val) for val in value)
+    return value
+
+
+# Rendered schemas keyed by (block_number, frozen properties); notebooks
+# tend to rebuild the same schema many times while iterating on a BLOCK.
+_schema_cache: dict = {}
+
+
+def _property_to_dict(prop_details: dict) -> dict:
+    """Convert a property-details dict to its schema representation.
+
+    Only the keys the schema understands ('description', 'type',
+    'default', 'items', 'properties') are carried over, in the order the
+    hand-written formatter emitted them.
+    """
+    ptype = prop_details["type"]
+    prop = {
+        "description": prop_details["description"],
+        "type": ptype,
+    }
 
-    # Handle default values
     if "default" in prop_details:
-        default_value = prop_details["default"]
-        if prop_details["type"] == "string":
-            default_value = f'"{default_value}"'
-        schema_str += f'{indent}  default: {default_value}\n'
-
-    # Handle nested properties for arrays or objects
-    if prop_details["type"] == "array" and "items" in prop_details:
-        schema_str += f'{indent}  items:\n'
-        # Add the array item type without the description
+        prop["default"] = prop_details["default"]
+
+    if ptype == "array" and "items" in prop_details:
+        # Keep the array item type without the description
         item_details = prop_details["items"]
-        schema_str += f'{indent}    type: {item_details["type"]}\n'
-        if "minimum" in item_details:
-            schema_str += f'{indent}    minimum: {item_details["minimum"]}\n'
-        if "maximum" in item_details:
-            schema_str += f'{indent}    maximum: {item_details["maximum"]}\n'
-
-    if prop_details["type"] == "object" and "properties" in prop_details:
-        schema_str += f'{indent}  properties:\n'
-        for nested_name, nested_details in prop_details["properties"].items():
-            schema_str += add_property(nested_name, nested_details, indent_level + 2)
+        items = {"type": item_details["type"]}
+        minimum = item_details.get("minimum")
+        if minimum is not None:
+            items["minimum"] = minimum
+        maximum = item_details.get("maximum")
+        if maximum is not None:
+            items["maximum"] = maximum
+        prop["items"] = items
 
-    return schema_str
+    if ptype == "object" and "properties" in prop_details:
+        prop["properties"] = {
+            nested_name: _property_to_dict(nested_details)
+            for nested_name, nested_details in prop_details["properties"].items()
+        }
+
+    return prop
 
 def build_configuration_schema(block_number: int, properties: dict) -> str:
     """
@@ -85,17 +230,36 @@ def build_configuration_schema(block_number: int, properties: dict) -> str:
     str
         A json-formatted configuration schema string.
     """
+    key = (block_number, _freeze(properties))
+    try:
+        return _schema_cache[key]
+    except KeyError:
+        pass
+    except TypeError:
+        # Unhashable value somewhere in the properties; skip caching.
+        key = None
+
     # Define the base schema with the BLOCK number
-    configuration_schema = (
-        '$schema: http://json-schema.org/draft-07/schema#\n'
-        f'title: BLOCK-{block_number} configuration\n'
-        f'description: Configuration for BLOCK-{block_number}.\n'
-        'type: object\n'
-        'properties:\n'
+    schema = {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'title': f'BLOCK-{block_number} configuration',
+        'description': f'Configuration for BLOCK-{block_number}.',
+        'type': 'object',
+        'properties': {
+            prop_name: _property_to_dict(prop_details)
+            for prop_name, prop_details in properties.items()
+        },
+    }
+
+    # Let the YAML emitter handle indentation and quoting of awkward
+    # values (colons, newlines) instead of formatting line by line.
+    configuration_schema = yaml.dump(
+        schema, Dumper=_YamlDumper, sort_keys=False, default_flow_style=False
     )
 
-    # Add each property to the schema
-    for prop_name, prop_details in properties.items():
-        configuration_schema += add_property(prop_name, prop_details)
+    if key is not None:
+        if len(_schema_cache) >= 128:
+            _schema_cache.clear()
+        _schema_cache[key] = configuration_schema
 
     return configuration_schema
@@ -19,12 +19,119 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import functools
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from lsst.daf.butler import Butler
 from lsst.pipe.base import TaskMetadata
-from astropy.time import Time
 
-__all__ = ['get_task_metadata', 'get_timing_from_metadata']
+__all__ = ['get_task_metadata', 'get_timing_from_metadata', 'iter_task_metadata']
+
+@functools.lru_cache(maxsize=8)
+def _get_butler(butler_path: str, collection: str) -> Butler:
+    """Return a Butler for the given repository and collection.
+
+    Creating a Butler opens a registry connection, which is expensive, so
+    instances are cached and shared across repeated calls.
+    """
+    return Butler(butler_path, collections=collection)
+
+
+@functools.lru_cache(maxsize=64)
+def _query_metadata_refs(
+    butler_path: str,
+    collection: str,
+    task: str,
+    visits: tuple[int, ...],
+    detectors: tuple[int, ...],
+) -> tuple:
+    """Resolve the metadata dataset refs for a task in one registry query.
+
+    Only datasets that actually exist are returned, so visit-level tasks
+    that produce one dataset per visit are not fanned out across every
+    detector. Refs are returned sorted by (visit, detector) for
+    deterministic ordering. Resolved refs are cached, so repeated calls
+    for the same task and data ids (e.g. from a notebook re-run) skip the
+    registry entirely; processed collections are immutable so the refs do
+    not go stale.
+    """
+    butler = _get_butler(butler_path, collection)
+    # Exposure-dimensioned tasks (e.g. isr) carry exposure rather than
+    # visit in their data ids, so constrain on whichever of the two the
+    # dataset type actually has; for LSSTCam the ids coincide.
+    dataset_type = butler.registry.getDatasetType(f"{task}_metadata")
+    id_dim = "visit" if "visit" in dataset_type.dimensions else "exposure"
+    # Constrain only on visit/exposure; tasks whose dimensions do not
+    # include detector would otherwise match nothing (or be queried per
+    # detector).
+    refs = butler.registry.queryDatasets(
+        dataset_type,
+        collections=collection,
+        findFirst=True,
+        where=f"{id_dim} IN (visits)",
+        bind={"visits": list(visits)},
+    )
+    detector_set = set(detectors)
+    refs = [
+        ref
+        for ref in refs
+        if ref.dataId.get("detector") is None
+        or ref.dataId["detector"] in detector_set
+    ]
+    # Return a tuple: the cached object is shared between callers, so it
+    # must not be mutable.
+    return tuple(
+        sorted(
+            refs,
+            key=lambda ref: (ref.dataId[id_dim], ref.dataId.get("detector", -1)),
+        )
+    )
+
+
+def iter_task_metadata(
+    butler_path: str,
+    collection: str,
+    task: str,
+    visit_list: list[int],
+    detector_list: list[int],
+) -> Iterator[TaskMetadata]:
+    """
+    Yield the metadata stored in the butler for a task, one dataset
+    at a time.
+
+    Unlike `get_task_metadata` this never holds more than one metadata
+    object in memory, which matters for long visit lists.
+
+    Parameters
+    ----------
+    butler_path: str
+        Path to butler repository.
+    collection: str
+        Name of the collection in butler where data is stored.
+    task: str
+        Name of the task from which to retrieve metadata.
+    visit_list: list(int)
+        Visit Ids to gather from butler.
+    detector_list: list(int)
+        Detector Ids.
+
+    Yields
+    ------
+    TaskMetadata
+        Metadata for one existing dataset at a time, ordered by
+        (visit, detector). Missing combinations are skipped, and
+        visit-level tasks yield one entry per visit.
+    """
+    butler = _get_butler(butler_path, collection)
+    refs = _query_metadata_refs(
+        butler_path, collection, task, tuple(visit_list), tuple(detector_list)
+    )
+    for ref in refs:
+        yield butler.get(ref)
+
 
 def get_task_metadata(
     butler_path: str,
@@ -37,6 +144,13 @@ def get_task_metadata(
     Gather the metadata stored in the butler for a list
     of tasks.
 
+    Only datasets that exist in the collection are returned: missing
+    (visit, detector) combinations are skipped rather than raising, and
+    visit-level tasks contribute one entry per visit, not one per
+    detector. A task's list can therefore be shorter than
+    ``len(visit_list) * len(detector_list)`` and should not be zipped
+    against those inputs; entries are ordered by (visit, detector).
+
     Parameters
     ----------
     butler_path: str
@@ -53,34 +167,43 @@ def get_task_metadata(
     Returns
     -------
     dict
-        Task metadata from all visits and detectors organized by task.
+        Metadata for each existing dataset of each task, organized
+        by task.
     """
 
-    butler = Butler(butler_path, collections=collection)
+    butler = _get_butler(butler_path, collection)
 
     md = {}
-
-    for task in task_list:
-        task_md = []
-        for visit in visit_list:
-            for detector in detector_list:
-                task_md.append(
-                    butler.get(
-                        f"{task}_metadata",
-                        exposure=visit,
-                        visit=visit,
-                        detector=detector,
-                        collections=collection,
-                    )
-                )
-        md[task] = task_md
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        for task in task_list:
+            # Resolve all refs for the task in one registry round-trip
+            # instead of one query per (visit, detector).
+            refs = _query_metadata_refs(
+                butler_path, collection, task, tuple(visit_list), tuple(detector_list)
+            )
+            # The payload fetches are I/O bound, so overlap the waits.
+            md[task] = list(executor.map(butler.get, refs))
 
     return md
 
 
+def _resolve_timing_keys(arrs: dict) -> tuple[str, str] | None:
+    """Return the (start, stop) array keys used by a quantum's metadata.
+
+    The key schema is homogeneous within a task, so this only needs to be
+    resolved once per task rather than once per quantum. Returns `None`
+    when the metadata carries no timing arrays.
+    """
+    if 'startUtc' in arrs:
+        return 'prepUtc', 'endUtc'
+    if 'runQuantumStartCpuTime' in arrs:
+        return 'runQuantumStartUtc', 'runQuantumEndUtc'
+    return None
+
+
 def get_timing_from_metadata(
-    task_md: dict[str, list[TaskMetadata]]
-) -> tuple[list[tuple[str, Time, Time]], list[Time], list[Time], list[float]]:
+    task_md: dict[str, Iterable[TaskMetadata]]
+) -> tuple[list[tuple[str, str, str]], list[str], list[str], list[float]]:
     """
     Get the timing information from the task metadata stored in the butler.
 
@@ -88,49 +211,84 @@ def get_timing_from_metadata(
     ----------
     task_md: dict
         Task Metadata collected from Butler. Keys should be task name
-        and values should be a list of the metadata from each iteration
-        of the task in the pipeline.
+        and values should be an iterable of the metadata from each
+        iteration of the task in the pipeline. Values may be lists from
+        `get_task_metadata` or lazy iterators from `iter_task_metadata`;
+        each is consumed in a single pass.
 
     Returns
     -------
     list
         Each element in the list contains a tuple for each process ran
         with the name of the task, start time, and finish time.
+        Times are the UTC timestamp strings from the metadata.
     list
-        Earliest start time of all processes for a type of task
+        Earliest start time of all processes for a type of task,
+        as a UTC timestamp string.
     list
-        Latest finish times for all processes for a type of task
+        Latest finish times for all processes for a type of task,
+        as a UTC timestamp string.
     list
-        Longest duration for a single process of a type of task
+        Longest duration in seconds for a single process of a type
+        of task.
     """
-    suffix = 'Utc'
     jobs = []
-    first_job = []
-    last_job = []
-    longest_job = []
-    for k, vv in task_md.items():
-        start_list = []
-        stop_list = []
-        duration = []
+    # Structure-of-arrays accumulation: one flat start/stop column across
+    # all tasks, with per-task slice bounds recorded in offsets. All
+    # timestamps are then parsed in a single batch and the per-task
+    # aggregates become numpy slice reductions.
+    starts = []
+    stops = []
+    offsets = []
+    for vv in task_md.values():
+        # Single pass so vv may be a lazy iterator; the timing keys are
+        # resolved from the first quantum that carries timing arrays.
+        keys = None
+        lo = len(starts)
         for v in vv:
-            subtask = 'quantum'
-            arrs = v[subtask].arrays
-            # print(arrs)
-            if 'startUtc' in arrs:
-                start = min(arrs['prep'+suffix])
-                stop = max(arrs['end'+suffix])
-            elif 'runQuantumStartCpuTime' in arrs:
-                start = min(arrs['runQuantumStart'+suffix])
-                stop = max(arrs['runQuantumEnd'+suffix])
-            else:
-                # Might be empty b/c intra is noop
+            arrs = v['quantum'].arrays
+            if keys is None:
+                keys = _resolve_timing_keys(arrs)
+                if keys is None:
+                    continue
+                start_key, stop_key = keys
+            if start_key not in arrs:
                 continue
-            jobs.append((list(v.metadata.keys())[0], start, stop))
-            start_list.append(start)
-            stop_list.append(stop)
-            duration.append((Time(stop[:-6]).mjd - Time(start[:-6]).mjd) * 86400)
-        first_job.append(min(start_list))
-        last_job.append(max(stop_list))
-        longest_job.append(max(duration))
+            # Fixed-format ISO timestamps sort lexicographically in
+            # chronological order, so numpy's C-level reductions give the
+            # same result as the interpreted min/max scans.
+            start = np.asarray(arrs[start_key]).min()
+            stop = np.asarray(arrs[stop_key]).max()
+            jobs.append((next(iter(v.metadata)), start, stop))
+            starts.append(start)
+            stops.append(stop)
+        if len(starts) == lo:
+            # Might be empty b/c intra is noop
+            continue
+        offsets.append((lo, len(starts)))
+
+    if not starts:
+        return jobs, [], [], []
+
+    # Durations only need wall-clock deltas, so parse with the C-level
+    # datetime.fromisoformat; astropy Time's scale and leap-second
+    # machinery is far heavier and only matters for quanta straddling a
+    # leap second.
+    duration = np.fromiter(
+        (
+            (
+                datetime.fromisoformat(stop[:-6])
+                - datetime.fromisoformat(start[:-6])
+            ).total_seconds()
+            for start, stop in zip(starts, stops)
+        ),
+        dtype=float,
+        count=len(starts),
+    )
+    # Lexicographic min/max on the fixed-format strings selects the
+    # per-task extremes; callers parse these strings themselves.
+    first_job = [min(starts[lo:hi]) for lo, hi in offsets]
+    last_job = [max(stops[lo:hi]) for lo, hi in offsets]
+    longest_job = [duration[lo:hi].max() for lo, hi in offsets]
 
     return jobs, first_job, last_job, longest_job
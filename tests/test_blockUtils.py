@@ -0,0 +1,119 @@
+# This file is part of ts_aos_analysis.
+#
+# Developed for the LSST Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import unittest
+
+import yaml
+
+from lsst.ts.aos.analysis.blockUtils import add_property, build_configuration_schema
+
+# Canonical property set covering the shapes the BLOCK notebooks use:
+# a string with a default, a bounded numeric array, and a nested object.
+CANONICAL_PROPERTIES = {
+    "filter": {
+        "description": "Filter to use.",
+        "type": "string",
+        "default": "r",
+    },
+    "offsets": {
+        "description": "Hexapod offsets in um.",
+        "type": "array",
+        "items": {"type": "number", "minimum": -100, "maximum": 100},
+    },
+    "camera": {
+        "description": "Camera settings.",
+        "type": "object",
+        "properties": {
+            "exposure_time": {
+                "description": "Exposure time in seconds.",
+                "type": "number",
+                "default": 30,
+            },
+        },
+    },
+}
+
+
+class BuildConfigurationSchemaTestCase(unittest.TestCase):
+    """Round-trip tests for the schema emitted by blockUtils."""
+
+    def test_round_trip(self):
+        """The dumped schema must load back to the expected structure."""
+        schema = yaml.safe_load(build_configuration_schema(321, CANONICAL_PROPERTIES))
+
+        self.assertEqual(schema["$schema"], "http://json-schema.org/draft-07/schema#")
+        self.assertEqual(schema["title"], "BLOCK-321 configuration")
+        self.assertEqual(schema["description"], "Configuration for BLOCK-321.")
+        self.assertEqual(schema["type"], "object")
+        self.assertEqual(
+            schema["properties"],
+            {
+                "filter": {
+                    "description": "Filter to use.",
+                    "type": "string",
+                    "default": "r",
+                },
+                "offsets": {
+                    "description": "Hexapod offsets in um.",
+                    "type": "array",
+                    "items": {"type": "number", "minimum": -100, "maximum": 100},
+                },
+                "camera": {
+                    "description": "Camera settings.",
+                    "type": "object",
+                    "properties": {
+                        "exposure_time": {
+                            "description": "Exposure time in seconds.",
+                            "type": "number",
+                            "default": 30,
+                        },
+                    },
+                },
+            },
+        )
+
+    def test_awkward_values_stay_parseable(self):
+        """Values with colons must round-trip, which the old hand-written
+        formatter could not guarantee."""
+        properties = {
+            "note": {
+                "description": "Warning: do not change.",
+                "type": "string",
+                "default": "a: b",
+            },
+        }
+        schema = yaml.safe_load(build_configuration_schema(1, properties))
+        self.assertEqual(schema["properties"]["note"]["description"], "Warning: do not change.")
+        self.assertEqual(schema["properties"]["note"]["default"], "a: b")
+
+    def test_add_property_snapshot(self):
+        """The string helper keeps its historical formatting."""
+        self.assertEqual(
+            add_property("filter", CANONICAL_PROPERTIES["filter"]),
+            '  filter:\n'
+            '    description: Filter to use.\n'
+            '    type: string\n'
+            '    default: "r"\n',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()